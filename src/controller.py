@@ -4,67 +4,99 @@ import cantools
 from cantools.database.can.signal import NamedSignalValue
 import numpy as np
 
+import readers
+
+
+def _raw_dtype(sig):
+    # smallest integer type that holds the raw signal bits
+    kind = 'int' if sig.is_signed else 'uint'
+    for bits in (8, 16, 32):
+        if sig.length <= bits:
+            return np.dtype(f'{kind}{bits}')
+    return np.dtype(f'{kind}64')
+
 
 class Controller:
-    def __init__(self):
-        self.conn = sqlite3.connect('telem.db')
+    def __init__(self, compact=False, db_path='telem.db'):
+        self.conn = sqlite3.connect(db_path)
         self.cur = self.conn.cursor()
 
+        # compact: store raw integer signal values and scale on fetch
+        self.compact = compact
+
         self.tables = set()
         self.numerical = {}
+        self.scaling = {}   # msg -> sig -> (raw dtype, scale, offset)
+
+        self.dbs = ()
+        self.messages = {}  # frame id -> cantools message (None if unknown)
+        self.log_file = None
 
     def load_log(self, file):
-        self.cur.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        for (table,) in self.cur.fetchall():
-            self.cur.execute(f'DROP TABLE IF EXISTS "{table}"')
-        self.conn.commit()
+        # raises ValueError/OSError for unreadable logs; the previous log is
+        # only replaced once the new one has been ingested completely
+        batches = readers.read_batches(file)
 
-        self.tables.clear()
-        self.numerical.clear()
+        saved = (self.tables, self.numerical, self.scaling, self.dbs, self.messages, self.log_file)
+        self.tables, self.numerical, self.scaling, self.messages = set(), {}, {}, {}
 
-        frucd_db = cantools.database.load_file('20240129 Gen5 CAN DB.dbc')
-        mc_db = cantools.database.load_file('FE12.dbc')
+        self.cur.execute('BEGIN')
+        try:
+            self._ingest(file, batches)
+        except Exception:
+            self.conn.rollback()
+            self.tables, self.numerical, self.scaling, self.dbs, self.messages, self.log_file = saved
+            raise
+        self.conn.commit()
 
-        with open(file, 'r', newline='') as raw:
-            reader = csv.reader(raw)
-            for row in reader:
-                if not row or len(row) < 10:
-                    continue
+    def _ingest(self, file, batches):
+        self.cur.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        for (table,) in self.cur.fetchall():
+            self.cur.execute(f'DROP TABLE IF EXISTS "{table}"')
 
-                try:
-                    frame_id = int(row[0], 16)
-                except Exception:
-                    continue
+        self.cur.execute(
+            'CREATE TABLE "_scaling" ("Message" TEXT, "Signal" TEXT, '
+            '"Dtype" TEXT, "Scale" REAL, "Offset" REAL)'
+        )
 
-                message = None
-                for db in (frucd_db, mc_db):
-                    try:
-                        message = db.get_message_by_frame_id(frame_id)
-                        break
-                    except KeyError:
-                        pass
+        self.dbs = (
+            cantools.database.load_file('20240129 Gen5 CAN DB.dbc'),
+            cantools.database.load_file('FE12.dbc'),
+        )
+        self.log_file = file
 
-                if message is None:
-                    continue
+        for frame_id, payloads, timestamps in batches:
+            message = self._message(frame_id)
+            if message is None:
+                continue
 
-                try:
-                    data = [int(b) if b else 0 for b in row[1:9]]
-                    timestamp = int(row[-1])
-                except Exception:
-                    continue
+            src = message.senders[0] if getattr(message, "senders", None) and len(message.senders) else "Unknown"
+            names = raw_sigs = special = None
+            rows = []
 
+            for data, timestamp in zip(payloads, timestamps):
                 try:
-                    decoded = message.decode(bytes(data))
+                    decoded = message.decode(data, scaling=not self.compact)
                 except Exception:
                     continue
 
-                src = message.senders[0] if getattr(message, "senders", None) and len(message.senders) else "Unknown"
-
                 if message.name not in self.tables:
                     cols = ['"Timestamp" INTEGER', '"Source" TEXT']
                     for sig in message.signals:
                         v = decoded.get(sig.name, None)
                         t = 'REAL' if isinstance(v, (float, int, np.integer, np.floating)) else 'TEXT'
+
+                        if self.compact and t == 'REAL' and not sig.is_float \
+                                and not sig.choices and sig.multiplexer_ids is None:
+                            t = 'INTEGER'
+                            dtype = _raw_dtype(sig)
+                            self.scaling.setdefault(message.name, {})[sig.name] = \
+                                (dtype, float(sig.scale), float(sig.offset))
+                            self.cur.execute(
+                                'INSERT INTO "_scaling" VALUES (?, ?, ?, ?, ?)',
+                                (message.name, sig.name, dtype.name, sig.scale, sig.offset)
+                            )
+
                         cols.append(f'"{sig.name}" {t}')
 
                     self.cur.execute(
@@ -72,32 +104,94 @@ class Controller:
                     )
                     self.tables.add(message.name)
 
-                columns = ['"Timestamp"', '"Source"']
-                values = [timestamp, src]
+                if names is None:
+                    names = [sig.name for sig in message.signals]
+                    raw_sigs = self.scaling.get(message.name, {})
+                    # only enum, multiplexed and (compact) scaled columns need fixing up
+                    special = [
+                        (j, sig) for j, sig in enumerate(message.signals, start=2)
+                        if sig.choices or sig.multiplexer_ids is not None
+                        or (self.compact and sig.name not in raw_sigs)
+                    ]
 
-                for sig in message.signals:
-                    v = decoded.get(sig.name, None)
+                values = [timestamp, src]
+                values.extend(map(decoded.get, names))
+                for j, sig in special:
+                    v = values[j]
                     if isinstance(v, NamedSignalValue):
-                        v = str(v)
-
-                    columns.append(f'"{sig.name}"')
-                    values.append(v)
-
-                    if isinstance(v, (float, int, np.integer, np.floating)):
-                        self.numerical.setdefault(src, {}) \
-                            .setdefault(message.name, set()) \
-                            .add(sig.name)
-
+                        values[j] = str(v)
+                    elif self.compact and sig.name not in raw_sigs \
+                            and isinstance(v, (float, int, np.integer, np.floating)):
+                        # float, enum and multiplexed signals are stored scaled
+                        values[j] = sig.conversion.raw_to_scaled(v, decode_choices=False)
+
+                rows.append(values)
+
+            numeric = {
+                name for j, name in enumerate(names or [], start=2)
+                if any(isinstance(r[j], (float, int, np.integer, np.floating)) for r in rows)
+            }
+            if numeric:
+                self.numerical.setdefault(src, {}) \
+                    .setdefault(message.name, set()) \
+                    .update(numeric)
+
+            if rows:
+                columns = ['"Timestamp"', '"Source"'] + [f'"{sig.name}"' for sig in message.signals]
                 q = f'''
                     INSERT INTO "{message.name}"
                     ({", ".join(columns)})
-                    VALUES ({",".join("?" * len(values))})
+                    VALUES ({",".join("?" * len(columns))})
                 '''
-                self.cur.execute(q, values)
+                self.cur.executemany(q, rows)
 
-        self.conn.commit()
+    def _message(self, frame_id):
+        if frame_id not in self.messages:
+            self.messages[frame_id] = None
+            for db in self.dbs:
+                try:
+                    self.messages[frame_id] = db.get_message_by_frame_id(frame_id)
+                    break
+                except KeyError:
+                    pass
+        return self.messages[frame_id]
+
+    def decode_frame(self, frame_id, data, scaling=True):
+        message = self._message(frame_id)
+        if message is None:
+            return None
+
+        try:
+            return message, message.decode(data, scaling=scaling)
+        except Exception:
+            return None
+
+    def _fetch_raw(self, msg, sig):
+        # -> (t [ms], raw values at their natural width, scale, offset)
+        meta = self.scaling.get(msg, {}).get(sig)
+        if meta is None:
+            return None
+
+        self.cur.execute(
+            f'SELECT Timestamp, "{sig}" FROM "{msg}" ORDER BY Timestamp'
+        )
+        rows = self.cur.fetchall()
+
+        dtype, scale, offset = meta
+        t = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        raw = np.fromiter((r[1] for r in rows), dtype=dtype, count=len(rows))
+        return t, raw, scale, offset
 
     def _fetch_signal(self, msg, sig):
+        if sig in self.scaling.get(msg, {}):
+            t, raw, scale, offset = self._fetch_raw(msg, sig)
+            y = raw.astype(float)
+            if scale != 1.0:
+                y *= scale
+            if offset != 0.0:
+                y += offset
+            return t / 1000.0, y
+
         self.cur.execute(
             f'SELECT Timestamp, "{sig}" FROM "{msg}" ORDER BY Timestamp'
         )
@@ -146,6 +240,166 @@ class Controller:
         out[valid] = y_src[idx[valid]]
         return out
 
+    def _iter_signal(self, msg, sig, chunk=65536):
+        # -> (t [s], y) chunks in timestamp order, without holding the whole signal
+        cur = self.conn.cursor()
+        cur.execute(
+            f'SELECT Timestamp, "{sig}" FROM "{msg}" ORDER BY Timestamp'
+        )
+        meta = self.scaling.get(msg, {}).get(sig)
+
+        while True:
+            rows = cur.fetchmany(chunk)
+            if not rows:
+                break
+
+            t = np.fromiter((r[0] for r in rows), dtype=float, count=len(rows)) / 1000.0
+            y = np.fromiter(
+                (r[1] if isinstance(r[1], (int, float)) else np.nan for r in rows),
+                dtype=float, count=len(rows)
+            )
+            if meta is not None:
+                _, scale, offset = meta
+                y = y * scale + offset
+
+            ok = np.isfinite(y)
+            if ok.any():
+                yield t[ok], y[ok]
+
+    def _iter_uniform(self, msg, sig, fs, chunk=65536):
+        # ZOH resample onto a uniform 1/fs grid chunk by chunk
+        # timestamps are whole ms; the grid is nudged well below that so a
+        # sample landing on a grid point is never lost to float rounding
+        eps = 1e-9
+        carry_t = carry_y = None
+        next_k = 0
+        t_start = None
+
+        for t, y in self._iter_signal(msg, sig, chunk):
+            if t_start is None:
+                t_start = t[0]
+            else:
+                t = np.concatenate(([carry_t], t))
+                y = np.concatenate(([carry_y], y))
+
+            # grid points before the last timestamp can no longer change
+            stop_k = int(np.ceil((t[-1] - t_start) * fs))
+            if stop_k > next_k:
+                t_new = t_start + np.arange(next_k, stop_k) / fs + eps
+                yield self._zoh_resample(t, y, t_new)
+                next_k = stop_k
+
+            carry_t, carry_y = t[-1], y[-1]
+
+        if carry_t is not None:
+            stop_k = int(np.floor((carry_t - t_start + eps) * fs)) + 1
+            if stop_k > next_k:
+                yield np.full(stop_k - next_k, carry_y, dtype=float)
+
+    def _estimate_rate(self, msg, sig, n=10000):
+        self.cur.execute(
+            f'SELECT Timestamp FROM "{msg}" WHERE "{sig}" IS NOT NULL '
+            f'ORDER BY Timestamp LIMIT {int(n)}'
+        )
+        # spacing in whole ms, so a steady 10 ms log gives exactly 100 Hz
+        dt = np.diff(np.array([r[0] for r in self.cur.fetchall()], dtype=np.int64))
+        dt = dt[dt > 0]
+        if not dt.size:
+            return None
+        return 1000.0 / float(np.median(dt))
+
+    def _iter_segments(self, msg, sig, fs, nperseg):
+        # Welch segments (Hann, 50% overlap) -> (segment start [s], one-sided PSD)
+        step = nperseg // 2
+        window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(nperseg) / nperseg)
+        scale = 1.0 / (fs * np.sum(window ** 2))
+
+        buf = np.empty(0, dtype=float)
+        consumed = 0   # grid samples dropped from the front of buf
+
+        for y in self._iter_uniform(msg, sig, fs):
+            buf = np.concatenate((buf, y))
+            if buf.size < nperseg:
+                continue
+
+            n_seg = (buf.size - nperseg) // step + 1
+            segs = np.lib.stride_tricks.sliding_window_view(buf, nperseg)[:n_seg * step:step]
+            segs = segs - segs.mean(axis=1, keepdims=True)
+
+            psd = np.abs(np.fft.rfft(segs * window, axis=1)) ** 2 * scale
+            psd[:, 1:-1 if nperseg % 2 == 0 else None] *= 2
+
+            starts = (consumed + np.arange(n_seg) * step) / fs
+            yield starts, psd
+
+            buf = buf[n_seg * step:]
+            consumed += n_seg * step
+
+    def get_psd_dataset(self, sel, nperseg=1024, fs=None):
+        if not sel:
+            return None
+        _, msg, sig = sel
+
+        fs = fs or self._estimate_rate(msg, sig)
+        if not fs:
+            return None
+
+        total = None
+        count = 0
+        for _, psd in self._iter_segments(msg, sig, fs, nperseg):
+            total = psd.sum(axis=0) if total is None else total + psd.sum(axis=0)
+            count += psd.shape[0]
+
+        if not count:
+            return None
+
+        f = np.fft.rfftfreq(nperseg, 1.0 / fs)
+        return (f"{sig} PSD", f, total / count, "psd", fs)
+
+    def get_spectrogram_dataset(self, sel, nperseg=1024, fs=None, max_cols=2000):
+        if not sel:
+            return None
+        _, msg, sig = sel
+
+        fs = fs or self._estimate_rate(msg, sig)
+        if not fs:
+            return None
+
+        # average neighbouring segments so the image stays at most max_cols wide
+        self.cur.execute(
+            f'SELECT MIN(Timestamp), MAX(Timestamp) FROM "{msg}" WHERE "{sig}" IS NOT NULL'
+        )
+        t_min, t_max = self.cur.fetchone()
+        if t_min is None:
+            return None
+        n_seg = max(1, int((t_max - t_min) / 1000.0 * fs) // (nperseg // 2))
+        group = max(1, -(-n_seg // int(max_cols)))
+
+        cols, times = [], []
+        acc_t, acc_p = [], []
+        for starts, psd in self._iter_segments(msg, sig, fs, nperseg):
+            acc_t.append(starts)
+            acc_p.append(psd)
+            t = np.concatenate(acc_t)
+            p = np.concatenate(acc_p)
+
+            n = (p.shape[0] // group) * group
+            if n:
+                cols.append(p[:n].reshape(-1, group, p.shape[1]).mean(axis=1))
+                times.append(t[:n].reshape(-1, group).mean(axis=1))
+            acc_t, acc_p = [t[n:]], [p[n:]]
+
+        if acc_p and acc_p[0].shape[0]:
+            cols.append(acc_p[0].mean(axis=0, keepdims=True))
+            times.append(acc_t[0].mean(keepdims=True))
+
+        if not cols:
+            return None
+
+        t = np.concatenate(times) + t_min / 1000.0 + nperseg / (2.0 * fs)
+        f = np.fft.rfftfreq(nperseg, 1.0 / fs)
+        return (f"{sig} Spectrogram", t, f, "spec", np.concatenate(cols).T)
+
     def get_xy_dataset(self, x_sel, y_sel, dt=0.02):
         if not x_sel or not y_sel:
             return None
@@ -205,4 +459,8 @@ class Controller:
                 for _, row in rem:
                     writer.writerow(row)
 
-        print(f"Merged logs written to {out_path}")
\ No newline at end of file
+        print(f"Merged logs written to {out_path}")
+
+    def convert_log(self, src_path, out_path):
+        readers.write_binary(readers.read_frames(src_path), out_path)
+        print(f"Binary log written to {out_path}")
\ No newline at end of file
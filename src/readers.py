@@ -0,0 +1,197 @@
+import csv
+import os
+import struct
+
+import can
+import numpy as np
+
+
+# compact native log: 16 byte header followed by fixed-size little endian records
+BINARY_MAGIC = b'FRUCDCAN'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<8sII')   # magic, version, record size
+FRAME_DTYPE = np.dtype([
+    ('timestamp', '<i8'),   # [ms]
+    ('id', '<u4'),
+    ('dlc', 'u1'),
+    ('data', 'u1', (8,)),
+])
+
+CHUNK = 65536
+
+
+# readers open and validate the file up front, so a bad log fails before
+# ingest touches the database, then return a lazy frame iterator
+
+def read_csv(path):
+    # hex ID, 8 byte columns, ..., timestamp [ms] in the last column
+    return _iter_csv(open(path, 'r', newline=''))
+
+
+def _iter_csv(raw):
+    with raw:
+        for row in csv.reader(raw):
+            if not row or len(row) < 10:
+                continue
+
+            try:
+                frame_id = int(row[0], 16)
+                data = bytes(int(b) if b else 0 for b in row[1:9])
+                timestamp = int(row[-1])
+            except Exception:
+                continue
+
+            yield frame_id, data, timestamp
+
+
+def read_can(path):
+    # ASC, BLF and candump (.log) through python-can
+    return _iter_can(path, can.LogReader(path))
+
+
+def _iter_can(path, reader):
+    with reader:
+        try:
+            for msg in reader:
+                if msg.is_error_frame or msg.is_remote_frame:
+                    continue
+                data = bytes(msg.data[:8]).ljust(8, b'\x00')
+                yield msg.arbitration_id, data, int(round(msg.timestamp * 1000.0))
+        except Exception as e:
+            # python-can parsers raise assorted types for corrupt records
+            raise ValueError(f'{path}: {e}') from e
+
+
+def open_binary(path):
+    with open(path, 'rb') as f:
+        header = f.read(BINARY_HEADER.size)
+
+    if len(header) < BINARY_HEADER.size:
+        raise ValueError(f'{path}: truncated header')
+    magic, version, itemsize = BINARY_HEADER.unpack(header)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION or itemsize != FRAME_DTYPE.itemsize:
+        raise ValueError(f'{path}: not a version {BINARY_VERSION} binary CAN log')
+
+    count = (os.path.getsize(path) - BINARY_HEADER.size) // FRAME_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=FRAME_DTYPE)
+
+    return np.memmap(path, dtype=FRAME_DTYPE, mode='r',
+                     offset=BINARY_HEADER.size, shape=(count,))
+
+
+def read_binary(path):
+    return _iter_binary(open_binary(path))
+
+
+def _iter_binary(frames):
+    for start in range(0, frames.size, CHUNK):
+        chunk = frames[start:start + CHUNK]
+        ids = chunk['id'].tolist()
+        timestamps = chunk['timestamp'].tolist()
+        payload = chunk['data'].tobytes()
+
+        for i in range(chunk.size):
+            yield ids[i], payload[8 * i:8 * i + 8], timestamps[i]
+
+
+def _batch_binary(frames):
+    # group each chunk by frame id straight from the structured array
+    for start in range(0, frames.size, CHUNK):
+        chunk = frames[start:start + CHUNK]
+        order = np.argsort(chunk['id'], kind='stable')
+        ids = chunk['id'][order]
+        timestamps = chunk['timestamp'][order].tolist()
+        # one copy of the payloads; cantools needs bytes, not memoryviews
+        payload = chunk['data'][order].tobytes()
+
+        uniq, first = np.unique(ids, return_index=True)
+        bounds = first.tolist() + [ids.size]
+        for k, frame_id in enumerate(uniq.tolist()):
+            lo, hi = bounds[k], bounds[k + 1]
+            yield frame_id, [payload[8 * i:8 * i + 8] for i in range(lo, hi)], timestamps[lo:hi]
+
+
+def _batch_frames(frames):
+    # group (frame id, data, timestamp) tuples by frame id, CHUNK at a time
+    groups = {}
+    n = 0
+    for frame_id, data, timestamp in frames:
+        group = groups.get(frame_id)
+        if group is None:
+            group = groups[frame_id] = ([], [])
+        group[0].append(data)
+        group[1].append(timestamp)
+        n += 1
+
+        if n == CHUNK:
+            for frame_id, (payloads, timestamps) in groups.items():
+                yield frame_id, payloads, timestamps
+            groups = {}
+            n = 0
+
+    for frame_id, (payloads, timestamps) in groups.items():
+        yield frame_id, payloads, timestamps
+
+
+def _pack(frames):
+    # -> FRAME_DTYPE arrays of up to CHUNK records
+    buf = np.zeros(CHUNK, dtype=FRAME_DTYPE)
+    n = 0
+
+    for frame_id, data, timestamp in frames:
+        rec = buf[n]
+        rec['timestamp'] = timestamp
+        rec['id'] = frame_id
+        rec['dlc'] = len(data)
+        rec['data'] = np.frombuffer(bytes(data[:8]).ljust(8, b'\x00'), dtype=np.uint8)
+        n += 1
+
+        if n == CHUNK:
+            yield buf
+            buf = np.zeros(CHUNK, dtype=FRAME_DTYPE)
+            n = 0
+
+    if n:
+        yield buf[:n]
+
+
+def write_binary(frames, path):
+    with open(path, 'wb') as f:
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, FRAME_DTYPE.itemsize))
+        for chunk in _pack(frames):
+            chunk.tofile(f)
+
+
+READERS = {
+    '.csv': read_csv,
+    '.asc': read_can,
+    '.blf': read_can,
+    '.log': read_can,
+    '.frl': read_binary,
+}
+
+
+def read_frames(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in READERS:
+        raise ValueError(f'Unsupported log format: {ext or path}')
+    return READERS[ext](path)
+
+
+def load_frames(path):
+    # whole log as a FRAME_DTYPE array; binary logs stay memory-mapped
+    if os.path.splitext(path)[1].lower() == '.frl':
+        return open_binary(path)
+
+    chunks = list(_pack(read_frames(path)))
+    if not chunks:
+        return np.zeros(0, dtype=FRAME_DTYPE)
+    return np.concatenate(chunks)
+
+
+def read_batches(path):
+    # -> (frame id, [payloads], [timestamps]) groups, in log order per frame id
+    if os.path.splitext(path)[1].lower() == '.frl':
+        return _batch_binary(open_binary(path))
+    return _batch_frames(read_frames(path))
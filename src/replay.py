@@ -0,0 +1,206 @@
+import time
+
+import numpy as np
+
+import readers
+
+
+class RingBuffer:
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self.t = np.empty(self.capacity, dtype=float)
+        self.y = np.empty(self.capacity, dtype=float)
+
+        self.head = 0       # next write index
+        self.size = 0
+        self.pending = 0    # samples pushed since the last read
+        self.dropped = 0    # samples overwritten before they were read
+
+    def clear(self):
+        self.head = 0
+        self.size = 0
+        self.pending = 0
+        self.dropped = 0
+
+    def push(self, t, y):
+        self.t[self.head] = t
+        self.y[self.head] = y
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.pending += 1
+
+    def resize(self, capacity):
+        # keeps the newest samples that still fit
+        capacity = int(capacity)
+        if capacity == self.capacity:
+            return
+        t, y = self.t, self.y
+        n = min(self.size, capacity)
+        idx = (self.head - n + np.arange(n)) % self.capacity
+
+        self.t = np.empty(capacity, dtype=float)
+        self.y = np.empty(capacity, dtype=float)
+        self.t[:n] = t[idx]
+        self.y[:n] = y[idx]
+        self.capacity = capacity
+        self.size = n
+        self.head = n % capacity
+        self.pending = min(self.pending, n)
+
+    def pending_t(self):
+        # timestamps of the samples pushed since the last read, oldest first
+        n = min(self.pending, self.size)
+        return self.t[(self.head - n + np.arange(n)) % self.capacity]
+
+    def read(self):
+        # -> (t, y) oldest first
+        if self.pending > self.capacity:
+            self.dropped += self.pending - self.capacity
+        self.pending = 0
+
+        if self.size < self.capacity:
+            return self.t[:self.size].copy(), self.y[:self.size].copy()
+
+        return (
+            np.concatenate((self.t[self.head:], self.t[:self.head])),
+            np.concatenate((self.y[self.head:], self.y[:self.head])),
+        )
+
+
+class Replay:
+    # feeds the loaded log through Controller.decode_frame into per-signal
+    # ring buffers at the original relative timestamps
+    # speed: time multiplier (1.0, 10.0, ...) or None for max speed
+
+    def __init__(self, controller, selected, speed=1.0, window=10.0,
+                 clock=time.perf_counter):
+        self.controller = controller
+        self.speed = speed
+        self.clock = clock
+
+        self.buffers = {}   # (msg, sig) -> RingBuffer
+        wanted = {}         # msg -> [(sig, RingBuffer)]
+        for src, msgs in (selected or {}).items():
+            for msg, sigs in msgs.items():
+                for sig in sigs:
+                    buf = self.buffers.setdefault((msg, sig), RingBuffer(16))
+                    wanted.setdefault(msg, []).append((sig, buf))
+
+        self.targets = {}   # frame id -> [(sig, RingBuffer)]
+        for frame_id, message in controller.messages.items():
+            if message is not None and message.name in wanted:
+                self.targets[frame_id] = wanted[message.name]
+
+        frames = readers.load_frames(controller.log_file)
+        self.t0 = int(frames['timestamp'].min()) if frames.size else 0
+
+        frames = frames[np.isin(frames['id'], list(self.targets))]
+        order = np.argsort(frames['timestamp'], kind='stable')
+        self.ids = frames['id'][order]
+        self.timestamps = frames['timestamp'][order]
+        self.data = frames['data'][order]
+
+        # peak-ish sample rate [Hz] per buffer, from the median frame spacing
+        self.rates = {id(buf): 0.0 for buf in self.buffers.values()}
+        for frame_id, targets in self.targets.items():
+            dt = np.diff(self.timestamps[self.ids == frame_id])
+            dt = dt[dt > 0]
+            rate = 1000.0 / float(np.median(dt)) if dt.size else 0.0
+            for _, buf in targets:
+                self.rates[id(buf)] += rate
+        self.set_window(window)
+
+        # frames decoded per poll at most; adapted to the budget as we go
+        self.batch = 1024
+
+        self.pos = 0
+        self.wall0 = None
+
+        self.fed = 0        # frames decoded into buffers
+        self.skipped = 0    # frames skipped to hold replay timing
+        self.coalesced = 0  # samples that missed their redraw and were drawn late
+
+    def set_window(self, window):
+        # size every buffer to hold window [s] of log time at its rate
+        self.window = float(window)
+        for buf in self.buffers.values():
+            buf.resize(max(16, int(np.ceil(self.window * self.rates[id(buf)] * 1.25))))
+
+    @property
+    def done(self):
+        return self.pos >= self.timestamps.size
+
+    @property
+    def dropped(self):
+        return self.skipped + sum(buf.dropped for buf in self.buffers.values())
+
+    def start(self):
+        for buf in self.buffers.values():
+            buf.clear()
+        self.pos = 0
+        self.fed = self.skipped = self.coalesced = 0
+        self.wall0 = self.clock()
+
+    def poll(self, budget=0.01):
+        # decode the frames due by now, spending at most budget [s];
+        # returns the number of frames fed
+        started = self.clock()
+
+        if self.speed is None:
+            end = self.timestamps.size
+        else:
+            # schedule is anchored to the start so timer jitter never accumulates
+            due = self.t0 + (started - self.wall0) * 1000.0 * self.speed
+            end = int(np.searchsorted(self.timestamps, due, side='right'))
+
+        # per-poll work is bounded by batch, never by what is left of the log
+        stop = min(end, self.pos + self.batch)
+        ids = self.ids[self.pos:stop].tolist()
+        timestamps = ((self.timestamps[self.pos:stop] - self.t0) / 1000.0).tolist()
+        data = self.data[self.pos:stop].tobytes()
+
+        fed = 0
+        for i, frame_id in enumerate(ids):
+            if i % 256 == 0 and i and self.clock() - started > budget:
+                break
+
+            frame = self.controller.decode_frame(frame_id, data[8 * i:8 * i + 8])
+            fed += 1
+            if frame is None:
+                continue
+            _, decoded = frame
+
+            for sig, buf in self.targets[frame_id]:
+                v = decoded.get(sig, None)
+                if isinstance(v, (float, int, np.integer, np.floating)):
+                    buf.push(timestamps[i], float(v))
+
+        # grow the batch while the budget allows, shrink it once exceeded
+        if fed < len(ids):
+            self.batch = max(256, fed)
+        elif fed == self.batch:
+            self.batch *= 2
+
+        self.fed += fed
+        if self.speed is None:
+            self.pos += fed
+        else:
+            # out of budget: skip the rest so the replay stays on schedule
+            self.skipped += end - self.pos - fed
+            self.pos = end
+        return fed
+
+    def read(self, interval):
+        # -> {(msg, sig): (t, y)} for the renderer, redrawn every interval [s]
+        # samples more than one tick of log time (plus half a tick of timer
+        # jitter) before the newest one should have been drawn by an earlier
+        # redraw; max speed has no schedule
+        span = None if self.speed is None else 1.5 * interval * self.speed
+
+        out = {}
+        for key, buf in self.buffers.items():
+            if span is not None and buf.pending > 1:
+                t = buf.pending_t()
+                self.coalesced += int(np.count_nonzero(t < t[-1] - span))
+            out[key] = buf.read()
+        return out
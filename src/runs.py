@@ -0,0 +1,148 @@
+import os
+
+import numpy as np
+
+from controller import Controller
+
+
+class RunSet:
+    # several logs loaded side by side, each in its own database
+
+    def __init__(self, compact=False):
+        self.compact = compact
+        self.runs = []      # [(name, Controller)]
+
+    def load(self, files):
+        for _, ctrl in self.runs:
+            ctrl.conn.close()
+        self.runs = []
+
+        for i, file in enumerate(files):
+            ctrl = Controller(compact=self.compact, db_path=f'telem_run{i}.db')
+            ctrl.load_log(file)
+            self.runs.append((os.path.splitext(os.path.basename(file))[0], ctrl))
+
+    def common_signals(self):
+        # -> sorted [(src, msg, sig)] numerical in every run
+        common = None
+        for _, ctrl in self.runs:
+            sigs = {
+                (src, msg, sig)
+                for src, msgs in ctrl.numerical.items()
+                for msg, sig_set in msgs.items()
+                for sig in sig_set
+            }
+            common = sigs if common is None else common & sigs
+        return sorted(common or [])
+
+    def _decimated(self, ctrl, msg, sig, rate):
+        # -> (start [s], ZOH samples at rate), normalized for correlation
+        ctrl.cur.execute(
+            f'SELECT MIN(Timestamp) FROM "{msg}" WHERE "{sig}" IS NOT NULL'
+        )
+        (t_min,) = ctrl.cur.fetchone()
+        if t_min is None:
+            return None, None
+
+        y = np.concatenate(list(ctrl._iter_uniform(msg, sig, rate)) or [np.empty(0)])
+        if y.size < 2:
+            return None, None
+
+        y = y - np.mean(y)
+        std = np.std(y)
+        if std > 0:
+            y /= std
+        return t_min / 1000.0, y
+
+    def align(self, ref_sel, rate=10.0):
+        # -> per-run shift [s]; plot time = logger time - shift
+        # lags come from an FFT cross-correlation of the reference channel
+        # against the first run, sampled at rate Hz
+        _, msg, sig = ref_sel
+
+        decimated = [self._decimated(ctrl, msg, sig, rate) for _, ctrl in self.runs]
+        t_ref, y_ref = decimated[0]
+        if y_ref is None:
+            return [self._start(ctrl) for _, ctrl in self.runs]
+
+        shifts = []
+        for (t_start, y), (_, ctrl) in zip(decimated, self.runs):
+            if y is None:
+                shifts.append(self._start(ctrl))
+                continue
+
+            n = 1 << int(np.ceil(np.log2(y.size + y_ref.size - 1)))
+            corr = np.fft.irfft(np.fft.rfft(y, n) * np.conj(np.fft.rfft(y_ref, n)), n)
+
+            # corr[k] = sum y[i + k] * y_ref[i]; negative lags wrap around
+            lags = np.arange(n)
+            lags[lags >= y.size] -= n
+            r = self._pearson(corr, lags, y, y_ref)
+            k = int(np.argmax(r))
+
+            # parabolic peak interpolation for sub-sample lag
+            lag = float(lags[k])
+            left, right = r[k - 1], r[(k + 1) % n]
+            denom = left - 2 * r[k] + right
+            if np.isfinite(denom) and denom < 0:
+                lag += 0.5 * (left - right) / denom
+
+            shifts.append(t_start + lag / rate)
+
+        return shifts
+
+    def _pearson(self, corr, lags, y, y_ref):
+        # -> correlation coefficient of the overlap at each lag, from corr and
+        # running sums; a raw product sum is biased towards lag 0
+        # lags overlapping less than a quarter of the shorter run are dropped
+        lo = np.maximum(0, -lags)
+        hi = np.minimum(y_ref.size, y.size - lags)
+        m = hi - lo
+        valid = m >= max(2, min(y.size, y_ref.size) // 4)
+        lo, hi, m = lo[valid], hi[valid], m[valid]
+
+        def sums(v, a, b):
+            c = np.concatenate(([0.0], np.cumsum(v)))
+            c2 = np.concatenate(([0.0], np.cumsum(v * v)))
+            return c[b] - c[a], c2[b] - c2[a]
+
+        sy, syy = sums(y, lo + lags[valid], hi + lags[valid])
+        sr, srr = sums(y_ref, lo, hi)
+
+        cov = corr[valid] - sy * sr / m
+        var = (syy - sy * sy / m) * (srr - sr * sr / m)
+        r = np.full(lags.size, -np.inf)
+        r[valid] = np.where(var > 0, cov / np.sqrt(np.maximum(var, 1e-300)), -np.inf)
+        return r
+
+    def _start(self, ctrl):
+        # fallback: line the run up by its first frame
+        t_min = None
+        for table in ctrl.tables:
+            ctrl.cur.execute(f'SELECT MIN(Timestamp) FROM "{table}"')
+            (t,) = ctrl.cur.fetchone()
+            if t is not None and (t_min is None or t < t_min):
+                t_min = t
+        return (t_min or 0) / 1000.0
+
+    def get_overlay_dataset(self, sel, shifts=None):
+        _, msg, sig = sel
+        if shifts is None:
+            shifts = [self._start(ctrl) for _, ctrl in self.runs]
+
+        labels, traces = [], []
+        for (name, ctrl), shift in zip(self.runs, shifts):
+            if msg not in ctrl.tables:
+                continue
+            t, y = ctrl._fetch_signal(msg, sig)
+            if t.size == 0:
+                continue
+
+            labels.append(name)
+            traces.append((t - shift, y))
+
+        if not traces:
+            return None
+
+        # (name, labels, traces, "overlay")
+        return (f"{sig} ({len(traces)} runs)", labels, traces, "overlay")
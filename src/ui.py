@@ -10,17 +10,63 @@ import matplotlib
 import numpy as np
 matplotlib.use("qt5agg")
 from matplotlib import pyplot as plt
+from matplotlib.colors import LogNorm
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 
 from PyQt5.QtWidgets import (
     QWidget, QPushButton, QMainWindow, QToolBar, QAction, QCheckBox,
     QToolButton, QMenu, QHBoxLayout, QVBoxLayout, QFileDialog, QGroupBox,
-    QScrollArea, QSlider, QLabel, QSizePolicy, QComboBox, QDoubleSpinBox
+    QScrollArea, QSlider, QLabel, QSizePolicy, QComboBox, QDoubleSpinBox,
+    QMessageBox
 )
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 
 from controller import Controller
+from replay import Replay
+from runs import RunSet
+
+
+LOG_FILTER = 'CAN Logs (*.csv *.asc *.blf *.log *.frl)'
+
+
+def density_counts(x, y, xlim, ylim, nx, ny):
+    # -> (ny, nx) 2-D histogram of the points inside xlim x ylim, with empty
+    # bins masked; bins are half-open [lo, hi) and NaN points are dropped
+    x0, x1 = xlim
+    y0, y1 = ylim
+    fx = (np.asarray(x, dtype=float) - x0) * (nx / (x1 - x0))
+    fy = (np.asarray(y, dtype=float) - y0) * (ny / (y1 - y0))
+    ok = (fx >= 0) & (fx < nx) & (fy >= 0) & (fy < ny)
+
+    idx = fy[ok].astype(np.int64) * nx + fx[ok].astype(np.int64)
+    counts = np.bincount(idx, minlength=nx * ny).reshape(ny, nx)
+    return np.ma.masked_equal(counts, 0)
+
+
+def minmax_decimate(t, y, t0, t1, n_px):
+    # part of (t, y) within [t0, t1] reduced to the min and max of each of
+    # n_px columns; NaNs never hide a column's extremes and an all-NaN
+    # column stays a gap
+    lo = max(0, int(np.searchsorted(t, t0, side="left")) - 1)
+    hi = min(t.size, int(np.searchsorted(t, t1, side="right")) + 1)
+    t, y = t[lo:hi], y[lo:hi]
+
+    k = t.size // n_px
+    if k < 2:
+        return t, y
+
+    m = n_px * k
+    blocks = y[:m].reshape(n_px, k)
+    gaps = np.isnan(blocks)
+    base = np.arange(n_px) * k
+    idx = np.concatenate((
+        base + np.argmin(np.where(gaps, np.inf, blocks), axis=1),
+        base + np.argmax(np.where(gaps, -np.inf, blocks), axis=1),
+        np.arange(m, t.size),
+    ))
+    idx = np.unique(idx)
+    return t[idx], y[idx]
 
 
 class MainView(QMainWindow):
@@ -29,6 +75,7 @@ class MainView(QMainWindow):
         self.setWindowTitle('FRUCD Data Grapher')
 
         self.controller = Controller()
+        self.runs = RunSet()
 
         self.toolbar = QToolBar()
         self.addToolBar(self.toolbar)
@@ -41,15 +88,26 @@ class MainView(QMainWindow):
         self.add_dropdown('File', {
             'Open...': self.get_log,
             'Export CSV...': self.export_csv,
+            'Convert to Binary...': self.convert_log,
             '---': None,
             'Exit': self.close
         })
 
         self.plot_menu = self.add_dropdown('Plot', {
-            'Add...': self.get_graphs
+            'Add...': self.get_graphs,
+            'Replay...': self.get_replay
         })
         self.plot_menu.setEnabled(False)
 
+        self.runs_menu = self.add_dropdown('Runs', {
+            'Open...': self.get_runs,
+            'Overlay...': self.get_overlay
+        })
+
+        self.compact_cb = QCheckBox('Compact Storage')
+        self.compact_cb.setToolTip('Store raw integer signal values and scale them on fetch')
+        self.toolbar.addWidget(self.compact_cb)
+
         self.graphs = GraphWidget()
 
         self.scroll = QScrollArea()
@@ -79,21 +137,62 @@ class MainView(QMainWindow):
 
     def get_log(self):
         selector = QFileDialog(self)
-        selector.setNameFilter('*.csv')
+        selector.setNameFilter(LOG_FILTER)
         if selector.exec():
             file = selector.selectedFiles()[0]
-            self.controller.load_log(file)
+            self.controller.compact = self.compact_cb.isChecked()
+            try:
+                self.controller.load_log(file)
+            except (ValueError, OSError) as e:
+                QMessageBox.warning(self, 'Open Log', f'Could not load {file}:\n{e}')
+                return
 
             self.graphs.fig.clear()
             self.graphs.canvas.draw()
 
             self.plot_menu.setEnabled(True)
 
+    def get_runs(self):
+        selector = QFileDialog(self)
+        selector.setNameFilter(LOG_FILTER)
+        selector.setFileMode(QFileDialog.ExistingFiles)
+        selector.setWindowTitle('Select CAN Logs')
+        if selector.exec():
+            self.runs.compact = self.compact_cb.isChecked()
+            try:
+                self.runs.load(selector.selectedFiles())
+            except (ValueError, OSError) as e:
+                QMessageBox.warning(self, 'Open Runs', f'Could not load runs:\n{e}')
+
+    def get_overlay(self):
+        if not self.runs.runs:
+            return
+        self.overlay_options = OverlayView(self.runs)
+        self.overlay_options.done.connect(self.display_overlay)
+        self.overlay_options.show()
+
+    def display_overlay(self, payload):
+        shifts = None
+        if payload.get("align"):
+            shifts = self.runs.align(payload.get("ref_sel"), payload.get("rate", 10.0))
+
+        ds = self.runs.get_overlay_dataset(payload.get("sel"), shifts)
+        self.graphs.plot_signals([ds] if ds is not None else [])
+
     def get_graphs(self):
         self.options = OptionsView(self.controller)
         self.options.done.connect(self.display_graphs)
         self.options.get_options()
 
+    def get_replay(self):
+        self.options = OptionsView(self.controller)
+        self.options.done.connect(self.display_replay)
+        self.options.get_options()
+
+    def display_replay(self, payload):
+        self.replay_view = ReplayView(self.controller, payload.get("timeseries", {}))
+        self.replay_view.show()
+
     def display_graphs(self, payload):
         datasets = []
 
@@ -110,6 +209,19 @@ class MainView(QMainWindow):
             if ds is not None:
                 datasets.append(ds)
 
+        spec = payload.get("spectral", None)
+        if spec and spec.get("enabled"):
+            mode = spec.get("mode", "PSD")
+            nperseg = spec.get("nperseg", 1024)
+            if mode in ("PSD", "Both"):
+                ds = self.controller.get_psd_dataset(spec.get("sel"), nperseg)
+                if ds is not None:
+                    datasets.append(ds)
+            if mode in ("Spectrogram", "Both"):
+                ds = self.controller.get_spectrogram_dataset(spec.get("sel"), nperseg)
+                if ds is not None:
+                    datasets.append(ds)
+
         self.graphs.plot_signals(datasets)
 
     def export_csv(self):
@@ -138,6 +250,28 @@ class MainView(QMainWindow):
 
         self.controller.export_csv(file_a, file_b, out_path)
 
+    def convert_log(self):
+        selector = QFileDialog(self)
+        selector.setNameFilter(LOG_FILTER)
+        selector.setWindowTitle('Select CAN Log')
+        if not selector.exec():
+            return
+        file = selector.selectedFiles()[0]
+
+        out_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save binary log as...",
+            "log.frl",
+            "Binary CAN Logs (*.frl)"
+        )
+        if not out_path:
+            return
+
+        try:
+            self.controller.convert_log(file, out_path)
+        except (ValueError, OSError) as e:
+            QMessageBox.warning(self, 'Convert to Binary', f'Could not convert {file}:\n{e}')
+
 
 class OptionsView(QMainWindow):
     done = pyqtSignal(object)
@@ -186,6 +320,39 @@ class OptionsView(QMainWindow):
         main_layout.addWidget(xy_group)
         # -------------------------------
 
+        # ---- spectral controls ----
+        spec_group = QGroupBox("Spectral Analysis (Welch PSD / Spectrogram)")
+        spec_layout = QHBoxLayout()
+        spec_group.setLayout(spec_layout)
+
+        self.spec_enable = QCheckBox("Enable")
+        self.spec_enable.setChecked(False)
+
+        self.spec_combo = QComboBox()
+        self.spec_combo.setEnabled(False)
+
+        self.spec_mode = QComboBox()
+        self.spec_mode.addItems(["PSD", "Spectrogram", "Both"])
+        self.spec_mode.setEnabled(False)
+
+        self.nperseg_combo = QComboBox()
+        self.nperseg_combo.addItems(["256", "512", "1024", "2048", "4096", "8192"])
+        self.nperseg_combo.setCurrentText("1024")
+        self.nperseg_combo.setEnabled(False)
+
+        self.spec_enable.stateChanged.connect(self._on_spec_toggle)
+
+        spec_layout.addWidget(self.spec_enable)
+        spec_layout.addWidget(QLabel("Signal:"))
+        spec_layout.addWidget(self.spec_combo)
+        spec_layout.addWidget(QLabel("Mode:"))
+        spec_layout.addWidget(self.spec_mode)
+        spec_layout.addWidget(QLabel("Segment:"))
+        spec_layout.addWidget(self.nperseg_combo)
+
+        main_layout.addWidget(spec_group)
+        # ---------------------------
+
         menu = QWidget()
         self.menu_layout = QHBoxLayout()
         self.menu_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
@@ -208,10 +375,17 @@ class OptionsView(QMainWindow):
         self.y_combo.setEnabled(en)
         self.dt_spin.setEnabled(en)
 
+    def _on_spec_toggle(self):
+        en = self.spec_enable.isChecked()
+        self.spec_combo.setEnabled(en)
+        self.spec_mode.setEnabled(en)
+        self.nperseg_combo.setEnabled(en)
+
     def get_options(self):
         self.selected = {}
         self.x_combo.clear()
         self.y_combo.clear()
+        self.spec_combo.clear()
 
         for src, messages in self.controller.numerical.items():
             for message_name, signal_set in messages.items():
@@ -225,6 +399,9 @@ class OptionsView(QMainWindow):
                     self.y_combo.addItem(label)
                     self.y_combo.setItemData(self.y_combo.count() - 1, value)
 
+                    self.spec_combo.addItem(label)
+                    self.spec_combo.setItemData(self.spec_combo.count() - 1, value)
+
         # default Y different from X if possible
         if self.y_combo.count() > 1:
             self.y_combo.setCurrentIndex(1)
@@ -304,16 +481,236 @@ class OptionsView(QMainWindow):
                 "dt": float(self.dt_spin.value()),
             }
 
+        spec_payload = {"enabled": False}
+        if self.spec_enable.isChecked() and self.spec_combo.count():
+            spec_payload = {
+                "enabled": True,
+                "sel": self.spec_combo.currentData(),
+                "mode": self.spec_mode.currentText(),
+                "nperseg": int(self.nperseg_combo.currentText()),
+            }
+
         payload = {
             "timeseries": self.selected,
             "xy": xy_payload,
+            "spectral": spec_payload,
         }
 
         self.done.emit(payload)
         self.close()
 
 
+class OverlayView(QMainWindow):
+    done = pyqtSignal(object)
+
+    def __init__(self, runs):
+        super().__init__()
+        self.runs = runs
+
+        self.setWindowTitle('Overlay Runs')
+        self.setGeometry(100, 100, 700, 200)
+
+        main_layout = QVBoxLayout()
+
+        sig_group = QGroupBox(f"Signal ({len(runs.runs)} runs)")
+        sig_layout = QHBoxLayout()
+        sig_group.setLayout(sig_layout)
+
+        self.sig_combo = QComboBox()
+        sig_layout.addWidget(self.sig_combo)
+
+        align_group = QGroupBox("Automatic Alignment (Cross-Correlation)")
+        align_layout = QHBoxLayout()
+        align_group.setLayout(align_layout)
+
+        self.align_enable = QCheckBox("Enable")
+        self.align_enable.setChecked(True)
+        self.align_enable.stateChanged.connect(self._on_align_toggle)
+
+        self.ref_combo = QComboBox()
+
+        self.rate_spin = QDoubleSpinBox()
+        self.rate_spin.setDecimals(1)
+        self.rate_spin.setRange(0.5, 100.0)
+        self.rate_spin.setValue(10.0)
+
+        align_layout.addWidget(self.align_enable)
+        align_layout.addWidget(QLabel("Reference:"))
+        align_layout.addWidget(self.ref_combo)
+        align_layout.addWidget(QLabel("Rate [Hz]:"))
+        align_layout.addWidget(self.rate_spin)
+
+        for src, msg, sig in runs.common_signals():
+            label = f"{src} | {msg} | {sig}"
+            for combo in (self.sig_combo, self.ref_combo):
+                combo.addItem(label)
+                combo.setItemData(combo.count() - 1, (src, msg, sig))
+
+        load_bttn = QPushButton('Overlay')
+        load_bttn.setMinimumHeight(50)
+        load_bttn.clicked.connect(self.get_selected)
+
+        main_layout.addWidget(sig_group)
+        main_layout.addWidget(align_group)
+        main_layout.addWidget(load_bttn)
+
+        view = QWidget()
+        view.setLayout(main_layout)
+        self.setCentralWidget(view)
+
+    def _on_align_toggle(self):
+        en = self.align_enable.isChecked()
+        self.ref_combo.setEnabled(en)
+        self.rate_spin.setEnabled(en)
+
+    def get_selected(self):
+        if not self.sig_combo.count():
+            self.close()
+            return
+
+        self.done.emit({
+            "sel": self.sig_combo.currentData(),
+            "align": self.align_enable.isChecked(),
+            "ref_sel": self.ref_combo.currentData(),
+            "rate": float(self.rate_spin.value()),
+        })
+        self.close()
+
+
+class ReplayView(QMainWindow):
+    SPEEDS = {'1x': 1.0, '10x': 10.0, 'Max': None}
+
+    def __init__(self, controller, selected):
+        super().__init__()
+        self.controller = controller
+        self.selected = selected
+        self.replay = None
+        self.lines = {}
+
+        self.setWindowTitle('Replay')
+        self.setGeometry(100, 100, 1000, 700)
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(16)
+        self.timer.timeout.connect(self._tick)
+
+        controls = QWidget()
+        controls_layout = QHBoxLayout()
+        controls.setLayout(controls_layout)
+
+        self.speed_combo = QComboBox()
+        self.speed_combo.addItems(list(self.SPEEDS))
+
+        self.window_spin = QDoubleSpinBox()
+        self.window_spin.setDecimals(1)
+        self.window_spin.setRange(1.0, 600.0)
+        self.window_spin.setValue(10.0)
+        self.window_spin.valueChanged.connect(self._on_window_changed)
+
+        self.start_bttn = QPushButton('Start')
+        self.start_bttn.clicked.connect(self.toggle)
+
+        self.status = QLabel('')
+
+        controls_layout.addWidget(QLabel("Speed:"))
+        controls_layout.addWidget(self.speed_combo)
+        controls_layout.addWidget(QLabel("Window [s]:"))
+        controls_layout.addWidget(self.window_spin)
+        controls_layout.addWidget(self.start_bttn)
+        controls_layout.addWidget(self.status, 1)
+
+        self.fig = plt.Figure(figsize=(10, 8))
+        self.canvas = FigureCanvas(self.fig)
+
+        layout = QVBoxLayout()
+        layout.addWidget(controls)
+        layout.addWidget(self.canvas)
+
+        view = QWidget()
+        view.setLayout(layout)
+        self.setCentralWidget(view)
+
+    def toggle(self):
+        if self.timer.isActive():
+            self.stop()
+        else:
+            self.start()
+
+    def start(self):
+        speed = self.SPEEDS[self.speed_combo.currentText()]
+        self.replay = Replay(self.controller, self.selected, speed=speed,
+                             window=float(self.window_spin.value()))
+
+        self.fig.clear()
+        self.lines = {}
+        keys = list(self.replay.buffers)
+        if keys:
+            axes = self.fig.subplots(len(keys), 1, sharex=True)
+            if len(keys) == 1:
+                axes = [axes]
+            for ax, (msg, sig) in zip(axes, keys):
+                self.lines[(msg, sig)], = ax.plot([], [], linewidth=1)
+                ax.set_ylabel(sig)
+                ax.grid(True)
+            axes[-1].set_xlabel("Time [s]")
+        self.fig.tight_layout()
+        self.canvas.draw()
+
+        self.speed_combo.setEnabled(False)
+        self.start_bttn.setText('Stop')
+        self.replay.start()
+        self.timer.start()
+
+    def _on_window_changed(self, value):
+        if self.replay is not None:
+            self.replay.set_window(value)
+
+    def stop(self):
+        self.timer.stop()
+        self.speed_combo.setEnabled(True)
+        self.start_bttn.setText('Start')
+
+    def _tick(self):
+        replay = self.replay
+        interval = self.timer.interval() / 1000.0
+        started = replay.clock()
+        skipped = replay.skipped
+
+        replay.poll(budget=interval / 2)
+
+        window = float(self.window_spin.value())
+        for key, (t, y) in replay.read(interval).items():
+            line = self.lines[key]
+            line.set_data(t, y)
+            if t.size:
+                ax = line.axes
+                ax.set_xlim(max(0.0, t[-1] - window), max(window, t[-1]))
+                ax.relim()
+                ax.autoscale_view(scalex=False)
+        self.canvas.draw()
+        render = replay.clock() - started
+
+        # behind once decode + draw no longer fit the tick or frames were skipped
+        behind = render > interval or replay.skipped > skipped
+        self.status.setText(
+            f"Frames: {replay.fed}  Coalesced: {replay.coalesced}  "
+            f"Dropped: {replay.dropped}  Tick: {render * 1000.0:.1f} ms"
+            + ("  (falling behind)" if behind else "")
+        )
+
+        if replay.done:
+            self.stop()
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
+
+
 class GraphWidget(QWidget):
+    # XY plots with more points than this are drawn as a density image
+    DENSITY_THRESHOLD = 50000
+
     def __init__(self):
         super().__init__()
 
@@ -321,10 +718,14 @@ class GraphWidget(QWidget):
         self.canvas = FigureCanvas(self.fig)
         self.toolbar = NavigationToolbar(self.canvas, self)
         self.canvas.hide()
+        self.canvas.mpl_connect("resize_event", self._schedule_refresh)
 
         self.current_datasets = []   # datasets
         self.windows = []            # per-plot MA window sizes (time-series only)
         self.slider_widgets = []     # [(slider, value_label)]
+        self.density = []            # [(ax, image, x, y)] density XY plots
+        self.overlays = []           # [(ax, line, t, y)] decimated run overlays
+        self._refresh_pending = False
 
         self.dark_mode_cb = QCheckBox("Dark Mode")
         self.dark_mode_cb.setChecked(False)
@@ -408,8 +809,74 @@ class GraphWidget(QWidget):
         kernel = np.ones(window) / window
         return np.convolve(y, kernel, mode="same")
 
+    def _density_counts(self, ax, x, y):
+        # one bin per screen pixel
+        xlim, ylim = ax.get_xlim(), ax.get_ylim()
+        counts = density_counts(
+            x, y, xlim, ylim, max(1, int(ax.bbox.width)), max(1, int(ax.bbox.height))
+        )
+        return counts, (*xlim, *ylim)
+
+    def _draw_density(self, ax, x, y, text_color):
+        x_min, x_max = float(np.min(x)), float(np.max(x))
+        y_min, y_max = float(np.min(y)), float(np.max(y))
+        x_pad = 0.02 * (x_max - x_min) or 0.5
+        y_pad = 0.02 * (y_max - y_min) or 0.5
+        ax.set_xlim(x_min - x_pad, x_max + x_pad)
+        ax.set_ylim(y_min - y_pad, y_max + y_pad)
+
+        counts, extent = self._density_counts(ax, x, y)
+        image = ax.imshow(
+            counts,
+            origin="lower",
+            extent=extent,
+            aspect="auto",
+            interpolation="nearest",
+            norm=LogNorm(vmin=1, vmax=max(2, counts.max())),
+        )
+
+        cbar = self.fig.colorbar(image, ax=ax)
+        cbar.set_label("Count", color=text_color)
+        cbar.ax.tick_params(colors=text_color)
+
+        self.density.append((ax, image, x, y))
+        ax.callbacks.connect("xlim_changed", self._schedule_refresh)
+        ax.callbacks.connect("ylim_changed", self._schedule_refresh)
+
+    def _minmax_decimate(self, ax, t, y):
+        t0, t1 = ax.get_xlim()
+        return minmax_decimate(t, y, t0, t1, max(1, int(ax.bbox.width)))
+
+    def _draw_overlay(self, ax, labels, traces):
+        for label, (t, y) in zip(labels, traces):
+            t = np.asarray(t, dtype=float)
+            y = np.asarray(y, dtype=float)
+            line, = ax.plot(t, y, linewidth=1, label=label)
+            self.overlays.append((ax, line, t, y))
+
+        ax.callbacks.connect("xlim_changed", self._schedule_refresh)
+
+    def _schedule_refresh(self, *_):
+        # zoom/pan fires both xlim and ylim changes; rebuild once afterwards
+        if (self.density or self.overlays) and not self._refresh_pending:
+            self._refresh_pending = True
+            QTimer.singleShot(0, self._refresh_view)
+
+    def _refresh_view(self):
+        self._refresh_pending = False
+        for ax, image, x, y in self.density:
+            counts, extent = self._density_counts(ax, x, y)
+            image.set_data(counts)
+            image.set_extent(extent)
+            image.norm.vmax = max(2, counts.max() or 0)
+        for ax, line, t, y in self.overlays:
+            line.set_data(*self._minmax_decimate(ax, t, y))
+        self.canvas.draw_idle()
+
     def _plot_all(self):
         self.fig.clear()
+        self.density = []
+        self.overlays = []
 
         dark = self.dark_mode_cb.isChecked()
         self.fig.patch.set_facecolor("#121212" if dark else "white")
@@ -423,9 +890,12 @@ class GraphWidget(QWidget):
 
         ts_list = [ds for ds in self.current_datasets if len(ds) >= 4 and ds[3] == "ts"]
         xy_list = [ds for ds in self.current_datasets if len(ds) >= 4 and ds[3] == "xy"]
+        psd_list = [ds for ds in self.current_datasets if len(ds) >= 4 and ds[3] == "psd"]
+        spec_list = [ds for ds in self.current_datasets if len(ds) >= 4 and ds[3] == "spec"]
+        overlay_list = [ds for ds in self.current_datasets if len(ds) >= 4 and ds[3] == "overlay"]
 
-        # total plots = time-series + xy plots
-        n = len(ts_list) + len(xy_list)
+        # total plots = time-series + xy + spectral + overlay plots
+        n = len(ts_list) + len(xy_list) + len(psd_list) + len(spec_list) + len(overlay_list)
         axes = self.fig.subplots(n, 1)
         if n == 1:
             axes = [axes]
@@ -500,7 +970,10 @@ class GraphWidget(QWidget):
             y = np.asarray(y, dtype=float)
 
             ax.set_facecolor("#121212" if dark else "white")
-            ax.scatter(x, y, s=6)
+            if x.size > self.DENSITY_THRESHOLD:
+                self._draw_density(ax, x, y, text_color)
+            else:
+                ax.scatter(x, y, s=6)
 
             ax.set_title(name, color=text_color)
             ax.set_xlabel(xlabel, color=text_color)
@@ -522,5 +995,84 @@ class GraphWidget(QWidget):
                     )
                 )
 
+        # --- PSD plots ---
+        for ds in psd_list:
+            ax = axes[ax_i]
+            ax_i += 1
+
+            # (name, f, psd, "psd", fs)
+            name, f, psd, _, fs = ds
+
+            ax.set_facecolor("#121212" if dark else "white")
+            ax.semilogy(f, psd, linewidth=1)
+
+            ax.set_title(name, color=text_color)
+            ax.set_xlabel("Frequency [Hz]", color=text_color)
+            ax.set_ylabel("PSD [unit\u00b2/Hz]", color=text_color)
+            ax.tick_params(colors=text_color)
+            ax.grid(True, color=grid_color, which="both")
+
+            if len(f) > 1:
+                peak = int(np.argmax(psd[1:])) + 1
+                ax.text(
+                    0.98, 0.98,
+                    f"Peak: {f[peak]:.2f} Hz\n"
+                    f"Resolution: {f[1]:.3f} Hz\n"
+                    f"Sample Rate: {fs:.2f} Hz",
+                    transform=ax.transAxes,
+                    va="top",
+                    ha="right",
+                    color=text_color,
+                    bbox=dict(
+                        facecolor="#1e1e1e" if dark else "white",
+                        alpha=0.85,
+                        edgecolor=grid_color
+                    )
+                )
+
+        # --- spectrograms ---
+        for ds in spec_list:
+            ax = axes[ax_i]
+            ax_i += 1
+
+            # (name, t, f, "spec", S[f, t])
+            name, t, f, _, S = ds
+            S_db = 10.0 * np.log10(np.maximum(S, np.finfo(float).tiny))
+
+            ax.set_facecolor("#121212" if dark else "white")
+            image = ax.pcolormesh(t, f, S_db, shading="nearest", rasterized=True)
+
+            cbar = self.fig.colorbar(image, ax=ax)
+            cbar.set_label("PSD [dB]", color=text_color)
+            cbar.ax.tick_params(colors=text_color)
+
+            ax.set_title(name, color=text_color)
+            ax.set_xlabel("Time [s]", color=text_color)
+            ax.set_ylabel("Frequency [Hz]", color=text_color)
+            ax.tick_params(colors=text_color)
+
+        # --- run overlays ---
+        for ds in overlay_list:
+            ax = axes[ax_i]
+            ax_i += 1
+
+            # (name, labels, traces, "overlay")
+            name, labels, traces, _ = ds
+
+            ax.set_facecolor("#121212" if dark else "white")
+            self._draw_overlay(ax, labels, traces)
+
+            ax.set_title(name, color=text_color)
+            ax.set_xlabel("Aligned Time [s]", color=text_color)
+            ax.set_ylabel(name, color=text_color)
+            ax.tick_params(colors=text_color)
+            ax.grid(True, color=grid_color)
+            legend = ax.legend(loc="upper right", facecolor="#1e1e1e" if dark else "white")
+            for text in legend.get_texts():
+                text.set_color(text_color)
+
         self.fig.tight_layout()
+        if self.density or self.overlays:
+            # tight_layout resized the axes; rebuild the pixel-sized views
+            self._refresh_view()
         self.canvas.draw()
\ No newline at end of file
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC)
+
+
+@pytest.fixture
+def dbc_dir(monkeypatch):
+    # Controller loads the DBCs relative to the working directory
+    monkeypatch.chdir(SRC)
+    return SRC
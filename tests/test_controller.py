@@ -0,0 +1,173 @@
+import csv
+
+import cantools
+import numpy as np
+import pytest
+
+from controller import Controller
+import readers
+
+
+def _payloads(message, rng, n):
+    # random raw values, cycling through every multiplexer id
+    mux_ids = sorted({i for sig in message.signals for i in (sig.multiplexer_ids or [])}) or [None]
+    for k in range(n):
+        raw = {}
+        for sig in message.signals:
+            lo = -(1 << (sig.length - 1)) if sig.is_signed else 0
+            hi = (1 << (sig.length - 1)) if sig.is_signed else (1 << sig.length)
+            raw[sig.name] = int(rng.integers(lo, hi, dtype=np.int64, endpoint=False)) \
+                if not sig.is_float else float(rng.normal())
+            if sig.is_multiplexer:
+                raw[sig.name] = mux_ids[k % len(mux_ids)]
+        data = message.encode(raw, scaling=False, strict=False)
+        yield bytes(data).ljust(8, b'\x00')
+
+
+@pytest.fixture
+def log(tmp_path, dbc_dir):
+    rng = np.random.default_rng(0)
+
+    path = tmp_path / 'log.csv'
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        timestamp = 0
+        for dbc in ('20240129 Gen5 CAN DB.dbc', 'FE12.dbc'):
+            for message in cantools.database.load_file(dbc).messages:
+                for data in _payloads(message, rng, 50):
+                    timestamp += 1
+                    writer.writerow([f'{message.frame_id:x}', *data, timestamp])
+    return str(path)
+
+
+def test_compact_matches_normal(log, tmp_path):
+    normal = Controller(db_path=str(tmp_path / 'normal.db'))
+    normal.load_log(log)
+    compact = Controller(compact=True, db_path=str(tmp_path / 'compact.db'))
+    compact.load_log(log)
+
+    assert compact.scaling
+    assert compact.numerical == normal.numerical
+    assert 'INV_Diag_Ia' in compact.numerical['INV']['M175_Diag_Data_Message']
+
+    for msg in normal.tables:
+        normal.cur.execute(f'SELECT * FROM "{msg}" ORDER BY rowid')
+        columns = [d[0] for d in normal.cur.description]
+        rows_n = normal.cur.fetchall()
+        compact.cur.execute(f'SELECT * FROM "{msg}" ORDER BY rowid')
+        rows_c = compact.cur.fetchall()
+        assert len(rows_c) == len(rows_n)
+
+        for j, sig in enumerate(columns[2:], start=2):
+            if sig in compact.scaling.get(msg, {}):
+                _, y = compact._fetch_signal(msg, sig)
+                expected = np.array([r[j] for r in sorted(rows_n, key=lambda r: r[0])], dtype=float)
+                np.testing.assert_allclose(y, expected, rtol=1e-12, err_msg=f'{msg}.{sig}')
+                continue
+
+            for r_n, r_c in zip(rows_n, rows_c):
+                assert r_c[j] == pytest.approx(r_n[j], rel=1e-12) if isinstance(r_n[j], float) \
+                    else r_c[j] == r_n[j], f'{msg}.{sig}'
+
+
+def _tables(ctrl):
+    out = {}
+    for msg in sorted(ctrl.tables):
+        ctrl.cur.execute(f'SELECT * FROM "{msg}" ORDER BY rowid')
+        out[msg] = ctrl.cur.fetchall()
+    return out
+
+
+def test_binary_ingest_matches_csv(log, tmp_path):
+    out = str(tmp_path / 'log.frl')
+    readers.write_binary(readers.read_frames(log), out)
+
+    from_csv = Controller(db_path=str(tmp_path / 'csv.db'))
+    from_csv.load_log(log)
+    from_frl = Controller(db_path=str(tmp_path / 'frl.db'))
+    from_frl.load_log(out)
+
+    assert from_frl.numerical == from_csv.numerical
+    assert _tables(from_frl) == _tables(from_csv)
+
+
+def test_failed_load_keeps_previous_log(log, tmp_path):
+    ctrl = Controller(db_path=str(tmp_path / 'telem.db'))
+    ctrl.load_log(log)
+    tables, numerical = _tables(ctrl), ctrl.numerical
+
+    bad = tmp_path / 'bad.log'
+    bad.write_text('(1.000000) can0 388#1234\n(1.001000) can0 zzzz\n')
+    with pytest.raises(ValueError):
+        ctrl.load_log(str(bad))
+
+    assert ctrl.log_file == log
+    assert ctrl.numerical is numerical
+    assert _tables(ctrl) == tables
+
+
+def _signal_log(tmp_path, t_ms, values):
+    # one torque feedback signal at the given timestamps [ms]
+    db = cantools.database.load_file('20240129 Gen5 CAN DB.dbc')
+    message = db.get_message_by_name('M172_Torque_And_Timer_Info')
+
+    path = tmp_path / 'signal.csv'
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        for t, v in zip(t_ms, values):
+            data = message.encode(
+                {sig.name: 0 for sig in message.signals} | {'INV_Torque_Feedback': float(v)},
+                strict=False,
+            )
+            writer.writerow([f'{message.frame_id:x}', *data, int(t)])
+
+    ctrl = Controller(db_path=str(tmp_path / 'signal.db'))
+    ctrl.load_log(str(path))
+    return ctrl
+
+
+def test_iter_uniform_matches_whole_signal_resample(tmp_path, dbc_dir):
+    rng = np.random.default_rng(2)
+    t_ms = 1000 + np.cumsum(rng.integers(3, 18, size=500))    # jittered frames
+    ctrl = _signal_log(tmp_path, t_ms, rng.normal(0, 100, size=500))
+    msg, sig, fs = 'M172_Torque_And_Timer_Info', 'INV_Torque_Feedback', 100.0
+
+    # grid in whole ms, so samples landing on a grid point are held exactly
+    _, y = ctrl._fetch_signal(msg, sig)
+    grid_ms = t_ms[0] + 10 * np.arange((t_ms[-1] - t_ms[0]) // 10 + 1)
+    expected = y[np.searchsorted(t_ms, grid_ms, side='right') - 1]
+
+    for chunk in (7, 64, 65536):
+        got = np.concatenate(list(ctrl._iter_uniform(msg, sig, fs, chunk=chunk)))
+        np.testing.assert_array_equal(got, expected, err_msg=f'chunk={chunk}')
+
+
+@pytest.fixture
+def tone(tmp_path, dbc_dir):
+    # 12.5 Hz, amplitude 50 sinusoid plus noise, sampled at 100 Hz for 60 s
+    rng = np.random.default_rng(3)
+    t_ms = np.arange(6000) * 10
+    y = 50.0 * np.sin(2 * np.pi * 12.5 * t_ms / 1000.0) + rng.normal(0, 5, size=t_ms.size)
+    return _signal_log(tmp_path, t_ms, y)
+
+
+def test_psd_peak_at_tone(tone):
+    _, f, psd, tag, fs = tone.get_psd_dataset(('INV', 'M172_Torque_And_Timer_Info', 'INV_Torque_Feedback'))
+
+    assert tag == 'psd'
+    assert fs == pytest.approx(100.0)
+    assert f[np.argmax(psd)] == pytest.approx(12.5)
+    # density integrates to the variance: tone A^2 / 2 plus noise
+    assert np.sum(psd) * (f[1] - f[0]) == pytest.approx(50.0 ** 2 / 2 + 5.0 ** 2, rel=0.05)
+
+
+def test_psd_matches_welch(tone):
+    signal = pytest.importorskip('scipy.signal')
+    msg, sig = 'M172_Torque_And_Timer_Info', 'INV_Torque_Feedback'
+
+    _, f, psd, _, fs = tone.get_psd_dataset(('INV', msg, sig), nperseg=256)
+    _, y = tone._fetch_signal(msg, sig)
+    f_ref, psd_ref = signal.welch(y, fs=fs, window='hann', nperseg=256, noverlap=128)
+
+    np.testing.assert_allclose(f, f_ref)
+    np.testing.assert_allclose(psd, psd_ref, rtol=1e-9, atol=1e-12 * psd_ref.max())
@@ -0,0 +1,112 @@
+import csv
+import struct
+
+import can
+import numpy as np
+import pytest
+
+import readers
+
+
+@pytest.fixture
+def csv_log(tmp_path):
+    rng = np.random.default_rng(0)
+    path = tmp_path / 'log.csv'
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        for i in range(1000):
+            frame_id = int(rng.choice([0x100, 0x388, 0x0A5]))
+            writer.writerow([f'{frame_id:x}', *rng.integers(0, 256, 8).tolist(), i * 3])
+        writer.writerow(['zz', 1, 2, 3, 4, 5, 6, 7, 8, 9])   # skipped
+    return str(path)
+
+
+def _header(magic=readers.BINARY_MAGIC, version=readers.BINARY_VERSION,
+            itemsize=readers.FRAME_DTYPE.itemsize):
+    return readers.BINARY_HEADER.pack(magic, version, itemsize)
+
+
+def test_binary_round_trip(csv_log, tmp_path):
+    out = str(tmp_path / 'log.frl')
+    readers.write_binary(readers.read_frames(csv_log), out)
+
+    frames = list(readers.read_csv(csv_log))
+    assert len(frames) == 1000
+    assert list(readers.read_frames(out)) == frames
+
+    loaded = readers.load_frames(out)
+    assert isinstance(loaded, np.memmap)
+    assert loaded['timestamp'].tolist() == [f[2] for f in frames]
+    assert (loaded['dlc'] == 8).all()
+
+
+def test_batches_match_frames(csv_log, tmp_path):
+    out = str(tmp_path / 'log.frl')
+    readers.write_binary(readers.read_frames(csv_log), out)
+
+    expected = {}
+    for frame_id, data, timestamp in readers.read_csv(csv_log):
+        expected.setdefault(frame_id, []).append((data, timestamp))
+
+    for path in (csv_log, out):
+        got = {}
+        for frame_id, payloads, timestamps in readers.read_batches(path):
+            got.setdefault(frame_id, []).extend(zip(payloads, timestamps))
+        assert got == expected
+
+
+@pytest.mark.parametrize('content', [
+    b'',                                                    # empty file
+    _header()[:10],                                         # truncated header
+    _header(magic=b'NOTACAN!'),                             # bad magic
+    _header(version=readers.BINARY_VERSION + 1),            # bad version
+    _header(itemsize=readers.FRAME_DTYPE.itemsize + 1),     # bad record size
+])
+def test_binary_header_rejected(tmp_path, content):
+    path = tmp_path / 'bad.frl'
+    path.write_bytes(content)
+
+    with pytest.raises(ValueError):
+        readers.read_frames(str(path))
+    with pytest.raises(ValueError):
+        readers.read_batches(str(path))
+
+
+def test_binary_header_only(tmp_path):
+    path = tmp_path / 'empty.frl'
+    path.write_bytes(_header())
+    assert list(readers.read_frames(str(path))) == []
+    assert readers.load_frames(str(path)).size == 0
+
+
+def test_short_dlc_padded(tmp_path):
+    out = str(tmp_path / 'short.frl')
+    readers.write_binary([(0x123, b'\x01\x02\x03', 5)], out)
+
+    frames = readers.open_binary(out)
+    assert frames['dlc'].tolist() == [3]
+    assert list(readers.read_frames(out)) == [(0x123, b'\x01\x02\x03' + bytes(5), 5)]
+
+    asc = str(tmp_path / 'short.asc')
+    with can.ASCWriter(asc) as writer:
+        writer.on_message_received(
+            can.Message(arbitration_id=0x123, data=b'\xaa\xbb', timestamp=1.0, is_extended_id=False)
+        )
+    [(frame_id, data, _)] = list(readers.read_frames(asc))
+    assert frame_id == 0x123
+    assert data == b'\xaa\xbb' + bytes(6)
+
+
+def test_corrupt_can_log_raises_value_error(tmp_path):
+    path = tmp_path / 'bad.log'
+    path.write_text('(1.000000) can0 388#1234\n(1.001000) can0 zzzz\n')
+
+    frames = readers.read_frames(str(path))
+    assert next(frames)[0] == 0x388
+    with pytest.raises(ValueError):
+        next(frames)
+
+
+def test_unsupported_extension(tmp_path):
+    with pytest.raises(ValueError):
+        readers.read_frames(str(tmp_path / 'log.txt'))
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+import readers
+from replay import Replay, RingBuffer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeMessage:
+    name = 'M'
+
+
+class FakeController:
+    # decodes the first payload byte as signal S; each decode costs decode_cost [s]
+    def __init__(self, log_file, clock, decode_cost=0.0):
+        self.log_file = log_file
+        self.messages = {0x100: FakeMessage()}
+        self.clock = clock
+        self.decode_cost = decode_cost
+
+    def decode_frame(self, frame_id, data, scaling=True):
+        self.clock.now += self.decode_cost
+        return self.messages[frame_id], {'S': data[0]}
+
+
+def _log(tmp_path, n, period_ms):
+    path = str(tmp_path / 'log.frl')
+    readers.write_binary(
+        ((0x100, bytes([i % 256]) + bytes(7), i * period_ms) for i in range(n)),
+        path
+    )
+    return path
+
+
+def _replay(tmp_path, n=1000, period_ms=10, speed=1.0, window=10.0, decode_cost=0.0):
+    clock = FakeClock()
+    ctrl = FakeController(_log(tmp_path, n, period_ms), clock, decode_cost)
+    replay = Replay(ctrl, {'Src': {'M': ['S']}}, speed=speed, window=window, clock=clock)
+    replay.start()
+    return replay, clock
+
+
+@pytest.mark.parametrize('speed', [1.0, 10.0])
+def test_feeds_due_frames(tmp_path, speed):
+    replay, clock = _replay(tmp_path, speed=speed)
+
+    clock.now = 0.5 / speed          # 500 ms of log time
+    assert replay.poll(budget=1.0) == 51
+    clock.now = 1.0 / speed
+    assert replay.poll(budget=1.0) == 50
+
+    t, y = replay.read(0.016)[('M', 'S')]
+    assert t[-1] == pytest.approx(1.0)
+    assert replay.fed == 101 and replay.skipped == 0
+
+
+def test_skips_frames_over_budget(tmp_path):
+    replay, clock = _replay(tmp_path, decode_cost=0.001)
+
+    clock.now = 9.99                 # whole log due at once
+    fed = replay.poll(budget=0.1)
+    assert fed == 256                # budget checked every 256 frames
+    assert replay.skipped == 1000 - fed
+    assert replay.done
+    assert replay.dropped == replay.skipped
+
+
+def test_max_speed_work_is_bounded(tmp_path):
+    replay, clock = _replay(tmp_path, n=20000, speed=None)
+
+    fed = replay.poll(budget=1.0)
+    assert fed == 1024               # initial batch, not the rest of the log
+    assert replay.pos == fed and replay.skipped == 0
+    assert replay.poll(budget=1.0) == 2048
+
+
+def test_ring_buffer_counts_overruns():
+    buf = RingBuffer(4)
+    for i in range(10):
+        buf.push(float(i), float(i))
+
+    t, y = buf.read()
+    assert buf.dropped == 6
+    assert t.tolist() == [6.0, 7.0, 8.0, 9.0]
+
+    buf.push(10.0, 10.0)
+    buf.read()
+    assert buf.dropped == 6
+
+
+def test_buffers_sized_from_window(tmp_path):
+    replay, _ = _replay(tmp_path, period_ms=1, n=5000)   # 1 kHz
+    buf = replay.buffers[('M', 'S')]
+    assert buf.capacity >= 10 * 1000
+
+    replay.set_window(20.0)
+    assert buf.capacity >= 20 * 1000
+
+
+def test_coalesces_only_late_samples(tmp_path):
+    replay, clock = _replay(tmp_path)
+    interval = 0.016
+
+    # on schedule: one redraw per interval
+    while clock.now < 0.5:
+        clock.now += interval
+        replay.poll(budget=1.0)
+        replay.read(interval)
+    assert replay.coalesced == 0
+
+    # one redraw 100 ms late: samples older than 1.5 ticks before the newest
+    clock.now += 0.1
+    replay.poll(budget=1.0)
+    t = replay.buffers[('M', 'S')].pending_t()
+    late = int(np.count_nonzero(t < t[-1] - 1.5 * interval))
+    assert late > 0
+    replay.read(interval)
+    assert replay.coalesced == late
@@ -0,0 +1,62 @@
+import csv
+
+import cantools
+import numpy as np
+import pytest
+
+from controller import Controller
+from runs import RunSet
+
+
+MESSAGE = 'M172_Torque_And_Timer_Info'
+SIGNAL = 'INV_Torque_Feedback'
+
+
+def _pattern(n):
+    # smooth random walk, scaled to fit the signal's range
+    rng = np.random.default_rng(1)
+    y = np.cumsum(rng.normal(size=n))
+    y = np.convolve(y, np.ones(100) / 100, mode='same')
+    return 100.0 * (y - y.mean()) / np.abs(y - y.mean()).max()
+
+
+@pytest.fixture
+def message(dbc_dir):
+    return cantools.database.load_file('20240129 Gen5 CAN DB.dbc').get_message_by_name(MESSAGE)
+
+
+def _run(tmp_path, message, name, pattern, offset, lag, n=3000):
+    # n samples at 100 Hz of pattern[lag:], logged with the clock at offset [ms]
+    path = tmp_path / f'{name}.csv'
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        for k in range(n):
+            values = {sig.name: 0 for sig in message.signals}
+            values[SIGNAL] = float(pattern[lag + k])
+            data = message.encode(values, strict=False)
+            writer.writerow([f'{message.frame_id:x}', *data, offset + 10 * k])
+
+    ctrl = Controller(db_path=str(tmp_path / f'{name}.db'))
+    ctrl.load_log(str(path))
+    return name, ctrl
+
+
+def test_align_recovers_offsets_and_lags(tmp_path, message):
+    pattern = _pattern(6000)
+    # (logger clock offset [ms], lag into the pattern [samples at 100 Hz])
+    logs = [(0, 400), (73_210, 537), (1_250_000, 123), (5_000, 2_400)]
+
+    runs = RunSet()
+    runs.runs = [
+        _run(tmp_path, message, f'run{i}', pattern, offset, lag)
+        for i, (offset, lag) in enumerate(logs)
+    ]
+    shifts = runs.align(('INV', MESSAGE, SIGNAL), rate=10.0)
+
+    # the same pattern sample must land at the same plot time in every run
+    ref_lag = logs[0][1]
+    expected = [offset / 1000.0 + (ref_lag - lag) / 100.0 for offset, lag in logs]
+    np.testing.assert_allclose(shifts, expected, atol=0.01)
+
+    for ctrl in (ctrl for _, ctrl in runs.runs):
+        ctrl.conn.close()
@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pytest
+
+from ui import GraphWidget, density_counts, minmax_decimate
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def test_density_counts_bins():
+    # 4 x 2 bins of 0.5 over [0, 2) x [0, 1)
+    x = np.array([0.0, 0.49, 0.5, 1.99, 1.0, 2.0, -0.01, 0.2, np.nan])
+    y = np.array([0.0, 0.49, 0.5, 0.99, 0.25, 0.5, 0.5, 1.0, 0.5])
+
+    counts = density_counts(x, y, (0.0, 2.0), (0.0, 1.0), 4, 2)
+
+    assert counts.shape == (2, 4)
+    # lower edges are inside, upper edges and points out of view are not
+    np.testing.assert_array_equal(counts.filled(0), [[2, 0, 1, 0], [0, 1, 0, 1]])
+    np.testing.assert_array_equal(counts.mask, [[False, True, False, True],
+                                                [True, False, True, False]])
+    assert counts.sum() == 5
+
+
+def test_density_counts_follows_view():
+    rng = np.random.default_rng(4)
+    x, y = rng.uniform(0, 10, size=(2, 10000))
+
+    counts = density_counts(x, y, (2.0, 4.0), (5.0, 10.0), 20, 50)
+
+    inside = (x >= 2) & (x < 4) & (y >= 5) & (y < 10)
+    assert counts.sum() == np.count_nonzero(inside)
+    expected, _, _ = np.histogram2d(y[inside], x[inside], bins=(50, 20), range=((5, 10), (2, 4)))
+    np.testing.assert_array_equal(counts.filled(0), expected)
+
+
+@pytest.mark.parametrize('n, density', [(100, False), (101, True)])
+def test_density_threshold(qapp, n, density):
+    graph = GraphWidget()
+    graph.DENSITY_THRESHOLD = 100
+    x = np.linspace(0, 1, n)
+    graph.plot_signals([('xy', x, x, 'xy', 'x', 'y')])
+
+    ax = graph.fig.axes[0]
+    assert len(graph.density) == int(density)
+    assert len(ax.images) == int(density)
+    assert len(ax.collections) == int(not density)
+
+
+def test_minmax_decimate_keeps_column_extremes():
+    t = np.arange(1000, dtype=float)
+    # all positive then all negative, so a gap read as 0 would win min or max
+    y = np.where(t < 500, 10.0, -10.0) + np.sin(t / 7.0)
+    y[[105, 750]] = [15.0, -15.0]   # spikes
+    y[[100, 101, 752]] = np.nan     # gaps next to them
+    y[600:700] = np.nan             # a whole column missing
+
+    td, yd = minmax_decimate(t, y, 0.0, 999.0, 10)
+
+    assert td.size == 19            # the empty column keeps one NaN
+    assert np.all(np.diff(td) > 0)
+    for c in range(10):
+        col = y[100 * c:100 * c + 100]
+        got = yd[(td >= 100 * c) & (td < 100 * c + 100)]
+        if np.all(np.isnan(col)):
+            assert np.all(np.isnan(got))
+        else:
+            assert np.nanmin(got) == np.nanmin(col)
+            assert np.nanmax(got) == np.nanmax(col)
+
+
+def test_minmax_decimate_clips_to_view():
+    t = np.arange(10000, dtype=float)
+    y = t.copy()
+
+    td, yd = minmax_decimate(t, y, 2000.0, 2999.5, 100)
+
+    # one sample either side of the view so the line reaches the edges
+    assert td[0] == 1999.0 and td[-1] == 3000.0
+    # min and max per column plus the leftover tail
+    assert td.size <= 2 * 100 + 10
+
+    # fewer than two samples per column: nothing to reduce
+    td, _ = minmax_decimate(t, y, 2000.0, 2100.0, 100)
+    np.testing.assert_array_equal(td, t[1999:2102])